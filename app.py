@@ -6,17 +6,24 @@ Deploy the RAG system as a web service with REST API endpoints.
 
 from flask import Flask, request, jsonify, render_template
 from flask_cors import CORS
+import itertools
 import os
+import time
 from pathlib import Path
 from dotenv import load_dotenv
 from werkzeug.utils import secure_filename
 
 # Import our RAG components
-from src.rag import get_embeddings, get_llm, is_technical_question
+from src.rag import get_embeddings, get_llm, is_technical_question, retrieve, get_rescore_vectors
+from src.rag import get_sentence_index, extractive_answer
+from src.rerank import get_reranker
+from src.vector_store import append_rescore_vectors
+from src.sentence_index import SentenceIndex
+from src.monitor import LatencyMonitor, start_probe
 from src.general_responses import get_general_response
 from langchain_community.vectorstores import FAISS
 from langchain_core.documents import Document
-from src.utils import sanitize_text, chunk_documents
+from src.utils import sanitize_text, chunk_documents, get_env
 from langchain_community.document_loaders import PyPDFLoader, TextLoader
 from langchain_community.document_loaders.unstructured import UnstructuredFileLoader
 
@@ -34,22 +41,56 @@ UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
 
 ALLOWED_EXTENSIONS = {'pdf', 'txt', 'md', 'markdown'}
 
+TOPICS = [
+    {
+        "name": "Machine Learning",
+        "description": "AI, algorithms, models, training",
+        "examples": ["What is supervised learning?", "How does neural network work?"]
+    },
+    {
+        "name": "Web Development",
+        "description": "Frontend, backend, frameworks, APIs",
+        "examples": ["How does React work?", "What is Node.js?"]
+    },
+    {
+        "name": "Data Science",
+        "description": "Analysis, visualization, statistics",
+        "examples": ["What is data cleaning?", "How to use pandas?"]
+    },
+    {
+        "name": "Cloud Computing",
+        "description": "AWS, Azure, deployment, scalability",
+        "examples": ["What is serverless?", "How does Docker work?"]
+    }
+]
+
 embeddings = None
 vs = None
 llm = None
-retriever = None
+reranker = None
+rescore_vectors = None
+sentence_index = None
+ready = False
+monitor = LatencyMonitor()
+_probe_count = itertools.count()
 
 def initialize_rag():
     """Initialize the RAG system components"""
-    global embeddings, vs, llm, retriever
+    global embeddings, vs, llm, reranker, rescore_vectors, sentence_index, ready
+    ready = False
 
     if not STORE_DIR.exists():
         raise RuntimeError("FAISS store not found. Run: python src/build_index.py")
 
     embeddings = get_embeddings()
     vs = FAISS.load_local(str(STORE_DIR), embeddings, allow_dangerous_deserialization=True)
-    retriever = vs.as_retriever(search_kwargs={"k": 4})
+    rescore_vectors = get_rescore_vectors(STORE_DIR, vs)
+    if reranker is None:
+        # Cross-encoder is independent of the index, so keep it across reloads
+        reranker = get_reranker()
     llm = get_llm()
+    # Sentences are only used for LOCAL extractive answers
+    sentence_index = get_sentence_index(STORE_DIR) if llm is None else None
 
 # Initialize on startup
 initialize_rag()
@@ -61,19 +102,86 @@ def index():
 
 @app.route('/health', methods=['GET'])
 def health_check():
-    """Health check endpoint"""
+    """Health check endpoint: readiness, loaded components and probe latency vs. SLO"""
+    healthy = ready and vs is not None and not monitor.breached()
     return jsonify({
-        "status": "healthy",
-        "message": "RAG Assistant API is running",
+        "status": "healthy" if healthy else "unhealthy",
+        "message": "RAG Assistant API is running" if healthy else "RAG Assistant API is degraded",
         "version": "4.0.2",
-        "topics": ["machine learning", "web development", "data science", "cloud computing"]
-    })
+        "topics": [t["name"].lower() for t in TOPICS],
+        "rag_system": {
+            "ready": ready,
+            "worker_pid": os.getpid(),
+            "index_size": vs.index.ntotal if vs is not None else 0,
+            "embedding_model_loaded": embeddings is not None,
+            "reranker_loaded": reranker is not None,
+            "sentence_index_loaded": sentence_index is not None,
+            "llm": type(llm).__name__ if llm is not None else "local-extractive",
+            "embeddings": type(embeddings).__name__ if embeddings is not None else None,
+            "latency": monitor.summary()
+        }
+    }), 200 if healthy else 503
 
 @app.route('/health-ui', methods=['GET'])
 def health_ui():
     """Health check UI page"""
     return render_template('health.html')
 
+def answer_technical(question, use_llm=True, use_cache=True):
+    """Run a technical question through retrieval and synthesis, returning (answer, sources)"""
+    # Use RAG for technical questions (over-fetch + re-rank)
+    query_vector = embeddings.embed_query(question)
+    docs = retrieve(question, vs, reranker, rescore_vectors=rescore_vectors,
+                    query_vector=query_vector, use_cache=use_cache)
+
+    # Check if we have relevant documents
+    relevant_docs = []
+    query_words = set(question.lower().split())
+    for doc in docs:
+        content_lower = doc.page_content.lower()
+        if any(word in content_lower for word in query_words if len(word) > 2):
+            relevant_docs.append(doc)
+
+    if not relevant_docs:
+        return get_general_response(question), []
+
+    # Generate answer from relevant docs
+    if llm is None or not use_llm:
+        # Local mode: pick the best precomputed sentences
+        answer = extractive_answer(relevant_docs[:3], query_vector, sentence_index)
+    else:
+        # Use LLM for synthesis
+        from langchain.prompts import PromptTemplate
+        from langchain.chains import LLMChain
+
+        prompt = PromptTemplate.from_template(
+            "You are a knowledgeable assistant. Answer the question using ONLY the provided context.\n"
+            "Structure your answer clearly with:\n"
+            "1. Direct answer to the question\n"
+            "2. Key supporting details\n"
+            "3. Source references\n\n"
+            "Question: {question}\n\n"
+            "Context:\n{context}\n\n"
+            "Answer:"
+        )
+
+        context = "\n\n---\n\n".join([f"Source: {d.metadata.get('source', 'Unknown')}\n{d.page_content}" for d in relevant_docs[:3]])
+        chain = LLMChain(llm=llm, prompt=prompt)
+        answer = chain.run(question=question, context=context)
+
+    # Format sources
+    sources = []
+    for i, doc in enumerate(relevant_docs[:3], 1):
+        meta = doc.metadata or {}
+        sources.append({
+            "id": i,
+            "source": Path(meta.get("source", "unknown")).name,
+            "page": meta.get("page", "N/A"),
+            "preview": doc.page_content[:100].replace('\n', ' ')
+        })
+
+    return answer, sources
+
 @app.route('/ask', methods=['POST'])
 def ask_question():
     """Main endpoint for asking questions"""
@@ -97,56 +205,10 @@ def ask_question():
 
         # Get answer based on question type
         if question_type == "technical":
-            # Use RAG for technical questions
-            docs = retriever.get_relevant_documents(question)
-
-            # Check if we have relevant documents
-            relevant_docs = []
-            query_words = set(question.lower().split())
-            for doc in docs:
-                content_lower = doc.page_content.lower()
-                if any(word in content_lower for word in query_words if len(word) > 2):
-                    relevant_docs.append(doc)
-
-            if not relevant_docs:
-                answer = get_general_response(question)
-                sources = []
-            else:
-                # Generate answer from relevant docs
-                if llm is None:
-                    # Local mode
-                    combined = " ".join([d.page_content for d in relevant_docs[:3]])[:1000]
-                    answer = f"Based on my knowledge: {sanitize_text(combined)}"
-                else:
-                    # Use LLM for synthesis
-                    from langchain.prompts import PromptTemplate
-                    from langchain.chains import LLMChain
-
-                    prompt = PromptTemplate.from_template(
-                        "You are a knowledgeable assistant. Answer the question using ONLY the provided context.\n"
-                        "Structure your answer clearly with:\n"
-                        "1. Direct answer to the question\n"
-                        "2. Key supporting details\n"
-                        "3. Source references\n\n"
-                        "Question: {question}\n\n"
-                        "Context:\n{context}\n\n"
-                        "Answer:"
-                    )
-
-                    context = "\n\n---\n\n".join([f"Source: {d.metadata.get('source', 'Unknown')}\n{d.page_content}" for d in relevant_docs[:3]])
-                    chain = LLMChain(llm=llm, prompt=prompt)
-                    answer = chain.run(question=question, context=context)
-
-                # Format sources
-                sources = []
-                for i, doc in enumerate(relevant_docs[:3], 1):
-                    meta = doc.metadata or {}
-                    sources.append({
-                        "id": i,
-                        "source": Path(meta.get("source", "unknown")).name,
-                        "page": meta.get("page", "N/A"),
-                        "preview": doc.page_content[:100].replace('\n', ' ')
-                    })
+            start = time.perf_counter()
+            answer, sources = answer_technical(question)
+            # Reported in /health next to the probe p95; only the probe decides health
+            monitor.record(time.perf_counter() - start, probe=False)
         else:
             # Use general response handler for non-technical questions
             answer = get_general_response(question)
@@ -170,30 +232,7 @@ def ask_question():
 @app.route('/topics', methods=['GET'])
 def get_topics():
     """Get available topics"""
-    return jsonify({
-        "topics": [
-            {
-                "name": "Machine Learning",
-                "description": "AI, algorithms, models, training",
-                "examples": ["What is supervised learning?", "How does neural network work?"]
-            },
-            {
-                "name": "Web Development",
-                "description": "Frontend, backend, frameworks, APIs",
-                "examples": ["How does React work?", "What is Node.js?"]
-            },
-            {
-                "name": "Data Science",
-                "description": "Analysis, visualization, statistics",
-                "examples": ["What is data cleaning?", "How to use pandas?"]
-            },
-            {
-                "name": "Cloud Computing",
-                "description": "AWS, Azure, deployment, scalability",
-                "examples": ["What is serverless?", "How does Docker work?"]
-            }
-        ]
-    })
+    return jsonify({"topics": TOPICS})
 
 def allowed_file(filename):
     """Check if file extension is allowed"""
@@ -202,7 +241,7 @@ def allowed_file(filename):
 @app.route('/upload', methods=['POST'])
 def upload_document():
     """Upload and process a document into the vector store"""
-    global vs, retriever
+    global vs
     
     try:
         # Check if file is in request
@@ -244,13 +283,25 @@ def upload_document():
         chunks = chunk_documents(documents)
         
         # Add to vector store
-        vs.add_documents(chunks)
+        texts = [c.page_content for c in chunks]
+        vectors = embeddings.embed_documents(texts)
+        vs.add_embeddings(list(zip(texts, vectors)), metadatas=[c.metadata for c in chunks])
+        if llm is not None:
+            # An LLM synthesizes answers, so don't embed sentences nobody reads
+            SentenceIndex.remove(STORE_DIR)
+        elif sentence_index is not None:
+            # Copy so this worker's mmap'd index isn't mutated mid-request
+            updated = sentence_index.copy()
+            updated.extend(chunks, embeddings)
+            updated.save(STORE_DIR)
         
-        # Save updated vector store
+        # Save updated vector store together with its rescoring vectors
+        append_rescore_vectors(STORE_DIR, rescore_vectors, vectors)
         vs.save_local(str(STORE_DIR))
         
         # Reload to ensure consistency across workers
         initialize_rag()
+        warm_up()
         
         app.logger.info(f"Successfully added {len(chunks)} chunks from {filename}")
         
@@ -269,6 +320,46 @@ def upload_document():
             "message": str(e)
         }), 500
 
+def warmup_queries():
+    """Configured warm-up/probe queries, defaulting to the /topics examples"""
+    configured = get_env("WARMUP_QUERIES")
+    if configured:
+        return [q.strip() for q in configured.split(";") if q.strip()]
+    return [q for t in TOPICS for q in t["examples"]]
+
+def warm_up():
+    """
+    Run the warm-up queries through embedding, search and synthesis so the
+    first real requests don't pay for lazy model init and cold index pages.
+    The LLM is skipped unless WARMUP_LLM=true, to avoid paid calls on every deploy.
+    Any failure is recorded in the monitor, so /health is 503 until a probe succeeds.
+    """
+    global ready
+    use_llm = get_env("WARMUP_LLM", "false").lower() == "true"
+    start = time.perf_counter()
+    for question in warmup_queries():
+        try:
+            answer_technical(question, use_llm=use_llm)
+        except Exception as e:
+            app.logger.error(f"Warm-up query failed ({question}): {e}")
+            monitor.record_error(e)
+    ready = True
+    app.logger.info(f"Warm-up finished in {time.perf_counter() - start:.2f}s")
+
+def probe():
+    """
+    One latency probe: a rotating warm-up query through the full retrieval path.
+    The re-rank score cache is bypassed, since warm-up already filled it for these
+    queries; the LLM is only called with PROBE_LLM=true (real /ask latencies cover it).
+    """
+    queries = warmup_queries()
+    use_llm = get_env("PROBE_LLM", "false").lower() == "true"
+    answer_technical(queries[next(_probe_count) % len(queries)], use_llm=use_llm, use_cache=False)
+
+# Warm up before this worker serves requests, then keep probing latency
+warm_up()
+start_probe(probe, monitor)
+
 @app.errorhandler(404)
 def not_found(error):
     return jsonify({"error": "Endpoint not found"}), 404
@@ -2,11 +2,15 @@
 import os
 from pathlib import Path
 
+import faiss
 from dotenv import load_dotenv
 from langchain_community.vectorstores import FAISS
 from langchain.embeddings.base import Embeddings
 
-from utils import load_documents, chunk_documents, get_env
+from utils import load_documents, chunk_documents, get_env, local_extractive_mode
+from vector_store import (compact_index, index_nbytes, held_out_recall,
+                          save_rescore_vectors, remove_rescore_vectors)
+from sentence_index import SentenceIndex, ensure_punkt
 
 load_dotenv()
 
@@ -29,6 +33,27 @@ def get_embeddings() -> Embeddings:
             encode_kwargs={'normalize_embeddings': True}
         )
 
+def compact_vectors(vs: FAISS, storage: str):
+    """Swap in a compact index, keep float32 vectors for rescoring, report the trade-off."""
+    vectors = vs.index.reconstruct_n(0, vs.index.ntotal)
+    exact = faiss.IndexFlat(vs.index.d, vs.index.metric_type)
+    exact.add(vectors)
+
+    compact_index(vs, storage)
+    save_rescore_vectors(STORE_DIR, vectors)
+
+    before, after = index_nbytes(exact), index_nbytes(vs.index)
+    print(f"Vector storage: {storage} ({before / 1024:.0f} KiB -> {after / 1024:.0f} KiB, "
+          f"{before / max(after, 1):.1f}x smaller)")
+
+    # Same over-fetch as the serving path; queries are chunks left out of the index
+    overfetch = int(get_env("VECTOR_RESCORE_OVERFETCH", "2"))
+    if len(vectors) >= 20:
+        first_pass, rescored = held_out_recall(vectors, storage, vs.index.metric_type,
+                                               overfetch=overfetch)
+        print(f"Held-out recall@10: {first_pass:.3f} first-pass, "
+              f"{rescored:.3f} with float32 rescoring ({overfetch}x over-fetch)")
+
 def main():
     docs = load_documents()
     chunks = chunk_documents(docs)
@@ -36,8 +61,28 @@ def main():
 
     print(f"Building FAISS index from {len(chunks)} chunks...")
     vs = FAISS.from_documents(chunks, embedding=embeddings)
+
+    storage = get_env("VECTOR_STORAGE", "float32").lower()
+    if storage == "float32":
+        # A stale side file from a previous compact build would no longer match
+        remove_rescore_vectors(STORE_DIR)
+    else:
+        compact_vectors(vs, storage)
+
+    # Only LOCAL extractive answers read sentences; with an LLM, embedding
+    # every sentence (possibly through a paid API) would be wasted
+    if get_env("SENTENCE_INDEX", "true").lower() == "true" and local_extractive_mode():
+        if not ensure_punkt():
+            print("Warning: could not download nltk punkt_tab; using punctuation-based sentence splits")
+        sentences = SentenceIndex.build(chunks, embeddings)
+        sentences.save(STORE_DIR)
+        print(f"Indexed {len(sentences.sentences)} sentences for extractive answers")
+    else:
+        # Stale sentences from a previous build would still be served
+        SentenceIndex.remove(STORE_DIR)
+
     vs.save_local(str(STORE_DIR))
     print(f"Saved FAISS index to: {STORE_DIR.resolve()}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
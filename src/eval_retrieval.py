@@ -0,0 +1,77 @@
+# src/eval_retrieval.py
+"""
+Retrieval precision check: plain FAISS top-k vs. over-fetch + cross-encoder re-rank.
+
+A retrieved chunk counts as relevant when it mentions the question's key term.
+Run from the repo root after building the index:
+    python -m src.eval_retrieval
+"""
+
+import statistics
+import time
+
+from langchain_community.vectorstores import FAISS
+
+from .rag import STORE_DIR, get_embeddings, get_rescore_vectors, retrieve
+from .rerank import choose_fetch_k, get_top_k, load_cross_encoder
+
+# The /topics example questions, each with a term a relevant chunk must contain
+EVAL_QUERIES = [
+    ("What is supervised learning?", "supervised"),
+    ("How does neural network work?", "neural"),
+    ("How does React work?", "react"),
+    ("What is Node.js?", "node"),
+    ("What is data cleaning?", "cleaning"),
+    ("How to use pandas?", "pandas"),
+    ("What is serverless?", "serverless"),
+    ("How does Docker work?", "docker"),
+]
+
+
+def precision_at_k(docs, term: str) -> float:
+    if not docs:
+        return 0.0
+    return sum(term in d.page_content.lower() for d in docs) / len(docs)
+
+
+def evaluate(vs: FAISS, reranker, top_k: int, rescore_vectors=None) -> dict:
+    precisions, latencies = [], []
+    for question, term in EVAL_QUERIES:
+        start = time.perf_counter()
+        docs = retrieve(question, vs, reranker, top_k=top_k,
+                        rescore_vectors=rescore_vectors, use_cache=False)
+        latencies.append((time.perf_counter() - start) * 1000)
+        precisions.append(precision_at_k(docs, term))
+    return {
+        "precision": statistics.mean(precisions),
+        "mean_ms": statistics.mean(latencies),
+        "max_ms": max(latencies),
+    }
+
+
+def main():
+    if not STORE_DIR.exists():
+        raise SystemExit("FAISS store not found. Run: python src/build_index.py")
+
+    vs = FAISS.load_local(str(STORE_DIR), get_embeddings(), allow_dangerous_deserialization=True)
+    # Same model and vector path as serving, even when RERANK_ENABLED=false
+    reranker = load_cross_encoder()
+    rescore_vectors = get_rescore_vectors(STORE_DIR, vs)
+    top_k = get_top_k()
+
+    # One untimed query per mode loads models and measures the re-rank cost
+    retrieve(EVAL_QUERIES[0][0], vs, None, top_k=top_k, rescore_vectors=rescore_vectors)
+    retrieve(EVAL_QUERIES[0][0], vs, reranker, top_k=top_k, rescore_vectors=rescore_vectors,
+             use_cache=False)
+
+    baseline = evaluate(vs, None, top_k, rescore_vectors)
+    reranked = evaluate(vs, reranker, top_k, rescore_vectors)
+
+    print(f"Retrieval precision@{top_k} over {len(EVAL_QUERIES)} questions")
+    print(f"  FAISS top-{top_k}:        {baseline['precision']:.3f}  "
+          f"({baseline['mean_ms']:.0f}ms mean, {baseline['max_ms']:.0f}ms max)")
+    print(f"  re-ranked (fetch {choose_fetch_k(top_k)}): {reranked['precision']:.3f}  "
+          f"({reranked['mean_ms']:.0f}ms mean, {reranked['max_ms']:.0f}ms max)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+# src/monitor.py
+"""
+Latency tracking for the health check.
+
+A background probe periodically runs a query through the RAG pipeline; /health
+reports its recent p95 and goes unhealthy when it breaches the latency SLO or
+the probe (or warm-up) starts failing. Real /ask latencies, which include LLM
+calls, are reported separately for comparison.
+"""
+
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+
+from .utils import get_env
+
+
+class LatencyMonitor:
+    """
+    Latencies over the last window_s seconds, for one worker. Probe samples
+    decide health against the SLO; real request samples include LLM time and
+    are reported alongside but never make the worker unhealthy. A slow spike
+    stops counting once it ages out of the window.
+    """
+
+    def __init__(self, window_s: float | None = None, slo_ms: float | None = None):
+        self.window_s = window_s or float(get_env("LATENCY_WINDOW_S", "300"))
+        self.slo_ms = slo_ms or float(get_env("LATENCY_SLO_MS", "2000"))
+        self.min_samples = int(get_env("LATENCY_SLO_MIN_SAMPLES", "3"))
+        self._probes = deque()  # (monotonic time, ms)
+        self._traffic = deque()
+        self._lock = threading.Lock()
+        self.last_probe = None
+        self.last_error = None
+
+    def _prune(self, samples: deque, now: float):
+        while samples and now - samples[0][0] > self.window_s:
+            samples.popleft()
+
+    def record(self, seconds: float, probe: bool = True):
+        now = time.monotonic()
+        samples = self._probes if probe else self._traffic
+        with self._lock:
+            samples.append((now, seconds * 1000.0))
+            self._prune(samples, now)
+            if probe:
+                self.last_probe = datetime.now(timezone.utc).isoformat()
+                self.last_error = None
+
+    def record_error(self, error: Exception):
+        with self._lock:
+            self.last_probe = datetime.now(timezone.utc).isoformat()
+            self.last_error = str(error)
+
+    def _window(self, probe: bool = True) -> list[float]:
+        samples = self._probes if probe else self._traffic
+        with self._lock:
+            self._prune(samples, time.monotonic())
+            return sorted(ms for _, ms in samples)
+
+    @staticmethod
+    def _p95(samples: list[float]) -> float | None:
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(0.95 * len(samples)))]
+
+    def p95_ms(self, probe: bool = True) -> float | None:
+        return self._p95(self._window(probe))
+
+    def breached(self) -> bool:
+        """True when the probe is failing or a full enough probe window misses the SLO."""
+        if self.last_error is not None:
+            return True
+        samples = self._window()
+        return len(samples) >= self.min_samples and self._p95(samples) > self.slo_ms
+
+    def summary(self) -> dict:
+        probes, traffic = self._window(), self._window(probe=False)
+        p95, traffic_p95 = self._p95(probes), self._p95(traffic)
+        return {
+            "p95_ms": round(p95, 1) if p95 is not None else None,
+            "slo_ms": self.slo_ms,
+            "window_s": self.window_s,
+            "samples": len(probes),
+            "traffic_p95_ms": round(traffic_p95, 1) if traffic_p95 is not None else None,
+            "traffic_samples": len(traffic),
+            "last_probe": self.last_probe,
+            "last_error": self.last_error,
+        }
+
+
+def start_probe(probe, monitor: LatencyMonitor, interval: float | None = None) -> threading.Thread:
+    """Run probe() every interval seconds in a daemon thread, timing each call."""
+    interval = interval or float(get_env("PROBE_INTERVAL_S", "30"))
+
+    def loop():
+        while True:
+            time.sleep(interval)
+            start = time.perf_counter()
+            try:
+                probe()
+            except Exception as e:
+                monitor.record_error(e)
+            else:
+                monitor.record(time.perf_counter() - start)
+
+    thread = threading.Thread(target=loop, name="latency-probe", daemon=True)
+    thread.start()
+    return thread
@@ -1,13 +1,19 @@
 # src/rag.py
+import logging
+import time
 from pathlib import Path
 from dotenv import load_dotenv
 
 from langchain_community.vectorstores import FAISS
 from langchain.embeddings.base import Embeddings
 from langchain_core.documents import Document
+from langchain_core.language_models.llms import LLM
 
 from .utils import get_env, sanitize_text
 from .general_responses import get_general_response
+from .rerank import get_reranker, get_top_k, choose_fetch_k, rerank
+from .vector_store import load_rescore_vectors, search as search_vectors
+from .sentence_index import SentenceIndex
 
 load_dotenv()
 STORE_DIR = Path("store/faiss")
@@ -26,7 +32,23 @@ def get_embeddings() -> Embeddings:
             encode_kwargs={'normalize_embeddings': True}
         )
 
+class FakeLLM(LLM):
+    """Offline stand-in for the OpenAI chat model, used for load testing."""
+    latency: float = 0.3
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake"
+
+    def _call(self, prompt: str, stop=None, run_manager=None, **kwargs) -> str:
+        # Simulate the network round-trip, then echo the start of the context
+        time.sleep(self.latency)
+        return "Based on the provided context: " + prompt.split("Context:")[-1][:300]
+
 def get_llm():
+    if get_env("FAKE_LLM", "false").lower() == "true":
+        return FakeLLM(latency=float(get_env("FAKE_LLM_LATENCY_MS", "300")) / 1000.0)
+
     backend = get_env("EMBEDDINGS_BACKEND", "LOCAL").upper()
     if backend == "OPENAI":
         from langchain_openai import ChatOpenAI
@@ -67,7 +89,44 @@ def is_technical_question(query: str) -> bool:
     query_lower = query.lower()
     return any(keyword in query_lower for keyword in technical_keywords)
 
-def synthesize_answer(query: str, docs: list[Document], llm):
+def get_rescore_vectors(store_dir: Path = STORE_DIR, vs: FAISS | None = None):
+    """Exact float32 vectors for rescoring a compact index, if enabled and built."""
+    if get_env("VECTOR_RESCORE", "true").lower() != "true":
+        return None
+    vectors = load_rescore_vectors(store_dir)
+    if vectors is not None and vs is not None and len(vectors) != vs.index.ntotal:
+        logging.getLogger(__name__).warning(
+            f"{store_dir} has {len(vectors)} rescoring vectors for {vs.index.ntotal} indexed chunks; "
+            "rescoring disabled until the index is rebuilt")
+        return None
+    return vectors
+
+def get_sentence_index(store_dir: Path = STORE_DIR):
+    """Precomputed sentences for LOCAL extractive answers, if build_index made them."""
+    return SentenceIndex.load(store_dir)
+
+def retrieve(query: str, vs: FAISS, reranker=None, top_k: int | None = None,
+             rescore_vectors=None, query_vector=None, use_cache: bool = True) -> list[Document]:
+    """Over-fetch candidates from FAISS, then re-rank down to top_k."""
+    top_k = top_k or get_top_k()
+    fetch_k = choose_fetch_k(top_k) if reranker is not None else top_k
+    rescore_k = fetch_k * int(get_env("VECTOR_RESCORE_OVERFETCH", "2"))
+    if query_vector is None:
+        query_vector = vs.embeddings.embed_query(query)
+    docs = search_vectors(vs, query_vector, fetch_k, rescore_vectors, rescore_k)
+    return rerank(query, docs, reranker, top_k, use_cache)
+
+def extractive_answer(docs: list[Document], query_vector=None, sentence_index=None,
+                      max_chars: int = 1000) -> str:
+    """LOCAL mode answer: best precomputed sentences, else the leading text of docs."""
+    if sentence_index is not None and query_vector is not None:
+        sentences = sentence_index.select(query_vector, docs, max_chars)
+        if sentences:
+            return f"Based on my knowledge: {' '.join(sentences)}"
+    combined = " ".join([d.page_content for d in docs])[:max_chars]
+    return f"Based on my knowledge: {sanitize_text(combined)}"
+
+def synthesize_answer(query: str, docs: list[Document], llm, query_vector=None, sentence_index=None):
     if llm is None:
         # Filter out irrelevant chunks for LOCAL MODE
         relevant_docs = []
@@ -86,8 +145,7 @@ def synthesize_answer(query: str, docs: list[Document], llm):
         relevant_docs = relevant_docs[:3]
 
         # Create a more focused summary
-        combined = " ".join([d.page_content for d in relevant_docs])[:1000]
-        return f"Based on my knowledge: {sanitize_text(combined)}"
+        return extractive_answer(relevant_docs, query_vector, sentence_index)
     else:
         from langchain.prompts import PromptTemplate
         from langchain.chains import LLMChain
@@ -117,7 +175,9 @@ def main():
 
     embeddings = get_embeddings()
     vs = FAISS.load_local(str(STORE_DIR), embeddings, allow_dangerous_deserialization=True)
-    retriever = vs.as_retriever(search_kwargs={"k": 4})
+    reranker = get_reranker()
+    rescore_vectors = get_rescore_vectors(STORE_DIR, vs)
+    sentence_index = get_sentence_index()
     llm = get_llm()
 
     while True:
@@ -132,9 +192,11 @@ def main():
                 continue
 
             # retrieve top-k chunks
-            docs = retriever.get_relevant_documents(question)
+            query_vector = embeddings.embed_query(question)
+            docs = retrieve(question, vs, reranker, rescore_vectors=rescore_vectors,
+                            query_vector=query_vector)
 
-            answer = synthesize_answer(question, docs, llm)
+            answer = synthesize_answer(question, docs, llm, query_vector, sentence_index)
 
             print(f"\n{'='*60}")
             print(f"QUESTION: {question}")
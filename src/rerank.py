@@ -0,0 +1,113 @@
+# src/rerank.py
+"""
+Second-stage re-ranking for retrieval.
+
+FAISS over-fetches a pool of candidates cheaply, then a small CPU cross-encoder
+scores every (query, chunk) pair in one batch and the best top-k are kept for
+synthesis. The candidate pool size is chosen per query from a latency budget.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from langchain_core.documents import Document
+
+from .utils import get_env, chunk_key
+
+_lock = threading.Lock()
+_score_cache: "OrderedDict[tuple[str, str], float]" = OrderedDict()
+_seconds_per_pair = None  # moving average of cross-encoder cost per pair
+
+
+def rerank_enabled() -> bool:
+    return get_env("RERANK_ENABLED", "true").lower() == "true"
+
+
+def get_top_k() -> int:
+    return int(get_env("RETRIEVAL_TOP_K", "4"))
+
+
+def get_reranker():
+    """Load the cross-encoder, or return None when re-ranking is disabled."""
+    if not rerank_enabled():
+        return None
+    return load_cross_encoder()
+
+
+def load_cross_encoder():
+    """Load the configured cross-encoder regardless of RERANK_ENABLED."""
+    from sentence_transformers import CrossEncoder
+    return CrossEncoder(
+        get_env("RERANK_MODEL", "cross-encoder/ms-marco-MiniLM-L-6-v2"),
+        device="cpu",
+        max_length=int(get_env("RERANK_MAX_LENGTH", "512")),
+    )
+
+
+def choose_fetch_k(top_k: int) -> int:
+    """Size the FAISS candidate pool so re-ranking fits the latency budget."""
+    min_k = max(top_k, int(get_env("RERANK_MIN_FETCH_K", "8")))
+    max_k = max(min_k, int(get_env("RERANK_MAX_FETCH_K", "32")))
+    budget = float(get_env("RERANK_LATENCY_BUDGET_MS", "150")) / 1000.0
+
+    with _lock:
+        per_pair = _seconds_per_pair
+    if per_pair is None or per_pair <= 0:
+        # No measurement yet: start at the cheap end until we have one
+        return min_k
+    return max(min_k, min(max_k, int(budget / per_pair)))
+
+
+def _record_cost(elapsed: float, pairs: int):
+    global _seconds_per_pair
+    sample = elapsed / pairs
+    with _lock:
+        if _seconds_per_pair is None:
+            _seconds_per_pair = sample
+        else:
+            _seconds_per_pair = 0.8 * _seconds_per_pair + 0.2 * sample
+
+
+def score_pairs(query: str, docs: list[Document], reranker, use_cache: bool = True) -> list[float]:
+    """
+    Cross-encoder scores for each doc, cached per (query, chunk) pair.
+    use_cache=False always runs the model, for measurements that must include it.
+    """
+    max_entries = int(get_env("RERANK_CACHE_SIZE", "4096"))
+    keys = [(query, chunk_key(d.page_content)) for d in docs]
+    scores: dict[tuple[str, str], float] = {}
+
+    with _lock:
+        for key in keys:
+            if use_cache and key in _score_cache:
+                _score_cache.move_to_end(key)
+                scores[key] = _score_cache[key]
+
+    missing = [(key, d) for key, d in zip(keys, docs) if key not in scores]
+    if missing:
+        start = time.perf_counter()
+        predicted = reranker.predict(
+            [(query, d.page_content) for _, d in missing],
+            batch_size=len(missing),
+            show_progress_bar=False,
+        )
+        _record_cost(time.perf_counter() - start, len(missing))
+
+        with _lock:
+            for (key, _), score in zip(missing, predicted):
+                scores[key] = float(score)
+                _score_cache[key] = float(score)
+            while len(_score_cache) > max_entries:
+                _score_cache.popitem(last=False)
+
+    return [scores[key] for key in keys]
+
+
+def rerank(query: str, docs: list[Document], reranker, top_k: int, use_cache: bool = True) -> list[Document]:
+    """Return the top_k docs ordered by cross-encoder relevance."""
+    if reranker is None or len(docs) <= 1:
+        return docs[:top_k]
+    scores = score_pairs(query, docs, reranker, use_cache)
+    order = sorted(range(len(docs)), key=lambda i: scores[i], reverse=True)
+    return [docs[i] for i in order[:top_k]]
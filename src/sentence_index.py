@@ -0,0 +1,178 @@
+# src/sentence_index.py
+"""
+Precomputed sentence index for LOCAL extractive answers.
+
+At build time every chunk is split into sanitized sentences and each sentence is
+embedded once and stored as float16. At request time the best sentences of the
+retrieved chunks are picked with a single dot product against the query embedding,
+so answers end on sentence boundaries and no regex runs over whole chunks.
+"""
+
+import json
+import logging
+import os
+import re
+from pathlib import Path
+
+import numpy as np
+
+try:
+    from .utils import chunk_key, sanitize_text
+except ImportError:  # imported as a script module by src/build_index.py
+    from utils import chunk_key, sanitize_text
+
+logger = logging.getLogger(__name__)
+
+VECTORS_FILE = "sentences.f16.npy"
+META_FILE = "sentences.json"
+
+MIN_SENTENCE_CHARS = 20
+
+# List markers are not part of the sentence text
+_LIST_MARKER = re.compile(r"^\s*([-*+]|\d+\.)\s+")
+
+
+_warned_fallback = False
+
+
+def ensure_punkt() -> bool:
+    """Download nltk's punkt_tab sentence model if missing; False if unavailable."""
+    import nltk
+    try:
+        nltk.data.find("tokenizers/punkt_tab")
+        return True
+    except LookupError:
+        return bool(nltk.download("punkt_tab", quiet=True))
+
+
+def _sent_tokenize(text: str) -> list[str]:
+    global _warned_fallback
+    try:
+        from nltk.tokenize import sent_tokenize
+        return sent_tokenize(text)
+    except LookupError:
+        if not _warned_fallback:
+            _warned_fallback = True
+            logger.warning("nltk punkt_tab data not found; splitting sentences on punctuation. "
+                           "Run: python -m nltk.downloader punkt_tab")
+        return re.split(r"(?<=[.!?])\s+", text)
+
+
+def _blocks(text: str) -> list[str]:
+    """Paragraphs and list items; markdown headings only separate blocks."""
+    blocks, current = [], []
+    for line in text.split("\n"):
+        stripped = line.strip()
+        if not stripped or stripped.startswith("#") or _LIST_MARKER.match(line):
+            if current:
+                blocks.append(" ".join(current))
+            current = []
+            if _LIST_MARKER.match(line):
+                current = [_LIST_MARKER.sub("", line)]
+            continue
+        current.append(stripped)
+    if current:
+        blocks.append(" ".join(current))
+    return blocks
+
+
+def split_sentences(text: str) -> list[str]:
+    """Sanitized sentences of a chunk, never spanning a paragraph or heading."""
+    sentences = []
+    for block in _blocks(text):
+        for sentence in _sent_tokenize(block):
+            sentence = sanitize_text(sentence)
+            if len(sentence) >= MIN_SENTENCE_CHARS:
+                sentences.append(sentence)
+    return sentences
+
+
+class SentenceIndex:
+    """Sentence texts and float16 embeddings, grouped by the chunk they came from."""
+
+    def __init__(self, sentences: list[str], vectors: np.ndarray, spans: dict[str, list[int]]):
+        self.sentences = sentences
+        self.vectors = vectors
+        self.spans = spans  # chunk_key -> [start, end) rows
+
+    @classmethod
+    def build(cls, chunks, embeddings) -> "SentenceIndex":
+        index = cls([], np.zeros((0, 0), dtype=np.float16), {})
+        index.extend(chunks, embeddings)
+        return index
+
+    def copy(self) -> "SentenceIndex":
+        """Shallow copy that can be extended without touching this index."""
+        return SentenceIndex(list(self.sentences), self.vectors, dict(self.spans))
+
+    def extend(self, chunks, embeddings) -> None:
+        """Add the sentences of chunks not already indexed."""
+        new_sentences = []
+        for chunk in chunks:
+            key = chunk_key(chunk.page_content)
+            if key in self.spans:
+                continue
+            start = len(self.sentences) + len(new_sentences)
+            new_sentences.extend(split_sentences(chunk.page_content))
+            self.spans[key] = [start, len(self.sentences) + len(new_sentences)]
+
+        if not new_sentences:
+            return
+        new_vectors = np.asarray(embeddings.embed_documents(new_sentences), dtype=np.float16)
+        if len(self.sentences) == 0:
+            self.vectors = new_vectors
+        else:
+            self.vectors = np.concatenate([self.vectors, new_vectors])
+        self.sentences.extend(new_sentences)
+
+    def save(self, store_dir: Path) -> None:
+        store_dir = Path(store_dir)
+        # Write-then-rename both files, so workers that mmap'd the old vectors keep
+        # a valid copy and a worker (re)starting mid-save never reads partial JSON
+        tmp = store_dir / f"{VECTORS_FILE}.tmp.npy"
+        np.save(tmp, self.vectors)
+        os.replace(tmp, store_dir / VECTORS_FILE)
+        tmp_meta = store_dir / f"{META_FILE}.tmp"
+        tmp_meta.write_text(json.dumps({"sentences": self.sentences, "spans": self.spans}))
+        os.replace(tmp_meta, store_dir / META_FILE)
+
+    @staticmethod
+    def remove(store_dir: Path) -> None:
+        """Delete a saved index so the API falls back to plain chunk text."""
+        for name in (VECTORS_FILE, META_FILE):
+            (Path(store_dir) / name).unlink(missing_ok=True)
+
+    @classmethod
+    def load(cls, store_dir: Path):
+        """Load a saved index, or return None if build_index did not create one."""
+        store_dir = Path(store_dir)
+        if not (store_dir / META_FILE).exists() or not (store_dir / VECTORS_FILE).exists():
+            return None
+        meta = json.loads((store_dir / META_FILE).read_text())
+        vectors = np.load(store_dir / VECTORS_FILE, mmap_mode="r")
+        return cls(meta["sentences"], vectors, meta["spans"])
+
+    def select(self, query_vector, docs, max_chars: int = 1000) -> list[str]:
+        """Highest-scoring sentences of docs within max_chars, in document order."""
+        rows = []
+        for doc in docs:
+            span = self.spans.get(chunk_key(doc.page_content))
+            if span:
+                rows.extend(range(*span))
+        if not rows:
+            return []
+
+        rows = np.array(rows)
+        query = np.asarray(query_vector, dtype=np.float32)
+        scores = np.asarray(self.vectors[rows], dtype=np.float32) @ query
+
+        picked, seen, used = [], set(), 0
+        for i in np.argsort(-scores):
+            text = self.sentences[rows[i]]
+            # Overlapping chunks repeat sentences; keep each once
+            if text in seen or used + len(text) > max_chars:
+                continue
+            seen.add(text)
+            picked.append(i)
+            used += len(text) + 1
+        return [self.sentences[rows[i]] for i in sorted(picked)]
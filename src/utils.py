@@ -1,4 +1,5 @@
 # src/utils.py
+import hashlib
 import os
 import re
 from pathlib import Path
@@ -30,6 +31,11 @@ def load_documents() -> List:
             docs.extend(UnstructuredFileLoader(str(p)).load())
     return docs
 
+def local_extractive_mode() -> bool:
+    """True when answers are extractive, i.e. rag.get_llm() returns None."""
+    return (get_env("FAKE_LLM", "false").lower() != "true"
+            and get_env("EMBEDDINGS_BACKEND", "LOCAL").upper() != "OPENAI")
+
 def chunk_documents(documents, chunk_size=1000, chunk_overlap=200):
     splitter = RecursiveCharacterTextSplitter(
         chunk_size=chunk_size,
@@ -41,4 +47,8 @@ def chunk_documents(documents, chunk_size=1000, chunk_overlap=200):
     return splitter.split_documents(documents)
 
 def sanitize_text(s: str) -> str:
-    return re.sub(r"\s+", " ", s).strip()
\ No newline at end of file
+    return re.sub(r"\s+", " ", s).strip()
+
+def chunk_key(text: str) -> str:
+    """Stable key for a chunk's content, used to look up per-chunk caches."""
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
@@ -0,0 +1,156 @@
+# src/vector_store.py
+"""
+Compact vector storage for the FAISS index.
+
+The first-pass search can run on a float16 or int8 scalar-quantized copy of the
+embeddings, while the exact float32 vectors live in an mmap'd side file that is
+only touched to rescore the top candidates. Workers share the side file through
+the page cache instead of each holding a float32 copy of the index.
+"""
+
+import logging
+import os
+from pathlib import Path
+
+import faiss
+import numpy as np
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+
+logger = logging.getLogger(__name__)
+
+RESCORE_FILE = "vectors.f32.npy"
+
+STORAGE_TYPES = {
+    "float16": faiss.ScalarQuantizer.QT_fp16,
+    "int8": faiss.ScalarQuantizer.QT_8bit,
+}
+
+
+def quantized_index(vectors: np.ndarray, storage: str, metric_type):
+    """A trained scalar-quantized FAISS index holding vectors."""
+    if storage not in STORAGE_TYPES:
+        raise ValueError(f"Unknown vector storage '{storage}'. Use: float32, {', '.join(STORAGE_TYPES)}")
+    index = faiss.IndexScalarQuantizer(vectors.shape[1], STORAGE_TYPES[storage], metric_type)
+    index.train(vectors)
+    index.add(vectors)
+    return index
+
+
+def compact_index(vs: FAISS, storage: str) -> None:
+    """Replace the flat float32 index of vs with a scalar-quantized one."""
+    vectors = vs.index.reconstruct_n(0, vs.index.ntotal)
+    vs.index = quantized_index(vectors, storage, vs.index.metric_type)
+
+
+def index_nbytes(index) -> int:
+    """Serialized size of a FAISS index, a close proxy for its resident memory."""
+    return int(faiss.serialize_index(index).nbytes)
+
+
+def recall_at_k(exact_index, approx_index, queries: np.ndarray, k: int = 10,
+                rescore_vectors: np.ndarray | None = None, overfetch: int = 2) -> float:
+    """
+    Fraction of the exact top-k neighbours that approx_index also returns. With
+    rescore_vectors, approx_index fetches k * overfetch candidates that are
+    re-ordered by exact distance, as the serving path does.
+    """
+    _, exact_ids = exact_index.search(queries, k)
+    if rescore_vectors is None:
+        _, approx_ids = approx_index.search(queries, k)
+    else:
+        _, candidates = approx_index.search(queries, k * overfetch)
+        approx_ids = [
+            _rescore(q, ids, rescore_vectors, exact_index.metric_type)[:k]
+            for q, ids in zip(queries, candidates)
+        ]
+    hits = sum(len(set(e) & set(a)) for e, a in zip(exact_ids, approx_ids))
+    return hits / exact_ids.size
+
+
+def held_out_recall(vectors: np.ndarray, storage: str, metric_type, k: int = 10,
+                    overfetch: int = 2, seed: int = 0) -> tuple[float, float]:
+    """
+    Recall@k of a compact index over chunks that are not themselves indexed.
+    Returns (first-pass recall, recall with float32 rescoring).
+    """
+    order = np.random.default_rng(seed).permutation(len(vectors))
+    n_queries = min(200, len(vectors) // 5)
+    queries, rest = vectors[order[:n_queries]], vectors[order[n_queries:]]
+    k = min(k, len(rest))
+
+    exact = faiss.IndexFlat(vectors.shape[1], metric_type)
+    exact.add(rest)
+    approx = quantized_index(rest, storage, metric_type)
+    return (recall_at_k(exact, approx, queries, k),
+            recall_at_k(exact, approx, queries, k, rescore_vectors=rest, overfetch=overfetch))
+
+
+def save_rescore_vectors(store_dir: Path, vectors: np.ndarray) -> None:
+    """Atomically write the float32 side file so live mmaps keep the old copy."""
+    path = Path(store_dir) / RESCORE_FILE
+    tmp = path.with_suffix(".tmp.npy")
+    np.save(tmp, np.ascontiguousarray(vectors, dtype=np.float32))
+    os.replace(tmp, path)
+
+
+def append_rescore_vectors(store_dir: Path, current, vectors) -> np.ndarray | None:
+    """
+    Extend this worker's rescoring vectors (the ones aligned with its in-memory
+    index) and write them out, so the side file matches the index saved with it.
+    """
+    if current is None:
+        return None
+    updated = np.concatenate([np.asarray(current), np.asarray(vectors, dtype=np.float32)])
+    save_rescore_vectors(store_dir, updated)
+    return updated
+
+
+def remove_rescore_vectors(store_dir: Path) -> None:
+    (Path(store_dir) / RESCORE_FILE).unlink(missing_ok=True)
+
+
+def load_rescore_vectors(store_dir: Path):
+    """Memory-map the float32 side file, or return None if there is none."""
+    path = Path(store_dir) / RESCORE_FILE
+    if not path.exists():
+        return None
+    return np.load(path, mmap_mode="r")
+
+
+def _rescore(query_vector: np.ndarray, ids: np.ndarray, vectors: np.ndarray, metric_type) -> np.ndarray:
+    # Sorted ids read the mmap'd rows in file order
+    ids = np.sort(ids[ids >= 0])
+    rows = np.asarray(vectors[ids], dtype=np.float32)
+    if metric_type == faiss.METRIC_INNER_PRODUCT:
+        order = np.argsort(-(rows @ query_vector))
+    else:
+        order = np.argsort(((rows - query_vector) ** 2).sum(axis=1))
+    return ids[order]
+
+
+def search(vs: FAISS, query_vector, k: int, rescore_vectors=None, rescore_k: int | None = None) -> list[Document]:
+    """
+    Search vs for the k nearest chunks. With rescore_vectors, fetch rescore_k
+    candidates from the (compact) index and re-order them by exact float32 distance.
+    """
+    query = np.asarray(query_vector, dtype=np.float32)
+    if rescore_vectors is not None and len(rescore_vectors) != vs.index.ntotal:
+        logger.warning(f"Rescoring skipped: {len(rescore_vectors)} float32 vectors "
+                       f"for {vs.index.ntotal} indexed chunks. Rebuild with build_index.py")
+        rescore_vectors = None
+
+    fetch = max(k, rescore_k or k) if rescore_vectors is not None else k
+    _, ids = vs.index.search(query.reshape(1, -1), fetch)
+    ids = ids[0]
+    if rescore_vectors is not None:
+        ids = _rescore(query, ids, rescore_vectors, vs.index.metric_type)
+
+    docs = []
+    for i in ids[:k]:
+        if i < 0:
+            continue
+        doc = vs.docstore.search(vs.index_to_docstore_id[int(i)])
+        if isinstance(doc, Document):
+            docs.append(doc)
+    return docs
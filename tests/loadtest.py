@@ -0,0 +1,377 @@
+"""
+Load Testing Harness for RAG Deployment
+Drives /ask, /upload or a mixed workload against a local instance, sweeps
+concurrency and reports throughput, latency percentiles, error rates and
+per-worker CPU/RSS. Can also launch gunicorn itself to compare worker/thread
+configurations.
+
+Run offline with the fake LLM standing in for OpenAI:
+    FAKE_LLM=true python tests/loadtest.py --gunicorn 2x1,2x4,4x1
+
+Note: with --base-url the upload and mixed workloads add documents to that
+instance's index. With --gunicorn each configuration runs against its own
+temporary copy of store/ and data/uploads/, so every run starts from the same index.
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from pathlib import Path
+
+import requests
+
+# Test configuration
+BASE_URL = "http://localhost:8000"
+TIMEOUT = 30  # seconds
+STARTUP_TIMEOUT = 180  # seconds for gunicorn to load models and the index
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+FALLBACK_QUESTIONS = [
+    "What is supervised learning?",
+    "How does React work?",
+    "What is data cleaning?",
+    "How does Docker work?",
+]
+
+
+def load_questions(base_url):
+    """Use the /topics examples as the query set"""
+    try:
+        topics = requests.get(f"{base_url}/topics", timeout=5).json()["topics"]
+        questions = [q for t in topics for q in t.get("examples", [])]
+        return questions or FALLBACK_QUESTIONS
+    except (requests.RequestException, KeyError, ValueError):
+        return FALLBACK_QUESTIONS
+
+
+def send_ask(session, base_url, questions):
+    payload = {"question": random.choice(questions)}
+    return session.post(f"{base_url}/ask", json=payload, timeout=TIMEOUT)
+
+
+def send_upload(session, base_url, questions):
+    name = f"loadtest_{uuid.uuid4().hex[:8]}.md"
+    body = "# Load Test Document\n\n" + "\n\n".join(
+        f"## {q}\nSynthetic paragraph about {q.lower()} used for load testing." for q in questions
+    )
+    files = {"file": (name, body.encode("utf-8"), "text/markdown")}
+    return session.post(f"{base_url}/upload", files=files, timeout=TIMEOUT * 4)
+
+
+def pick_request(workload, upload_ratio):
+    if workload == "ask":
+        return "ask", send_ask
+    if workload == "upload":
+        return "upload", send_upload
+    if random.random() < upload_ratio:
+        return "upload", send_upload
+    return "ask", send_ask
+
+
+# -----------------------------------------------------------------------------
+# Per-worker CPU / RSS sampling from /proc (Linux, as in the Docker image)
+# -----------------------------------------------------------------------------
+
+CLK_TCK = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def _read_stat(pid):
+    """Return (ppid, cpu_ticks, rss_bytes) for pid, or None if it is gone"""
+    try:
+        raw = Path(f"/proc/{pid}/stat").read_text()
+    except OSError:
+        return None
+    # The command name may contain spaces, so split after its closing paren
+    fields = raw[raw.rindex(")") + 2:].split()
+    ppid, utime, stime, rss_pages = int(fields[1]), int(fields[11]), int(fields[12]), int(fields[21])
+    return ppid, utime + stime, rss_pages * PAGE_SIZE
+
+
+def worker_pids(master_pid):
+    """The master process plus its direct children (gunicorn workers)"""
+    pids = [master_pid]
+    for entry in Path("/proc").iterdir():
+        if entry.name.isdigit():
+            stat = _read_stat(int(entry.name))
+            if stat and stat[0] == master_pid:
+                pids.append(int(entry.name))
+    return pids
+
+
+class ProcessSampler(threading.Thread):
+    """Sample CPU time and RSS of the server processes while a level runs"""
+
+    def __init__(self, master_pid, interval=0.5):
+        super().__init__(daemon=True)
+        self.master_pid = master_pid
+        self.interval = interval
+        self.stop_event = threading.Event()
+        self.first = {}
+        self.last = {}
+        self.peak_rss = {}
+
+    def sample(self):
+        now = time.time()
+        for pid in worker_pids(self.master_pid):
+            stat = _read_stat(pid)
+            if stat is None:
+                continue
+            _, ticks, rss = stat
+            self.first.setdefault(pid, (now, ticks))
+            self.last[pid] = (now, ticks)
+            self.peak_rss[pid] = max(self.peak_rss.get(pid, 0), rss)
+
+    def run(self):
+        while not self.stop_event.is_set():
+            self.sample()
+            self.stop_event.wait(self.interval)
+
+    def stop(self):
+        self.stop_event.set()
+        self.join()
+        self.sample()
+        report = []
+        for pid, (t0, ticks0) in self.first.items():
+            t1, ticks1 = self.last[pid]
+            elapsed = max(t1 - t0, 1e-6)
+            report.append({
+                "pid": pid,
+                "role": "master" if pid == self.master_pid else "worker",
+                "cpu_percent": round(100.0 * (ticks1 - ticks0) / CLK_TCK / elapsed, 1),
+                "peak_rss_mb": round(self.peak_rss[pid] / (1024 * 1024), 1),
+            })
+        return report
+
+
+# -----------------------------------------------------------------------------
+# Load generation
+# -----------------------------------------------------------------------------
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run_level(base_url, workload, concurrency, duration, questions, upload_ratio, master_pid=None):
+    """Run `concurrency` closed-loop clients for `duration` seconds"""
+    results = []
+    lock = threading.Lock()
+    deadline = time.time() + duration
+
+    def client():
+        session = requests.Session()
+        while time.time() < deadline:
+            kind, send = pick_request(workload, upload_ratio)
+            start = time.perf_counter()
+            try:
+                ok = send(session, base_url, questions).status_code == 200
+            except requests.RequestException:
+                ok = False
+            elapsed = time.perf_counter() - start
+            with lock:
+                results.append((kind, elapsed, ok))
+
+    sampler = ProcessSampler(master_pid) if master_pid else None
+    if sampler:
+        sampler.start()
+
+    started = time.time()
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.time() - started
+
+    latencies = [r[1] * 1000 for r in results if r[2]]
+    errors = sum(1 for r in results if not r[2])
+    level = {
+        "concurrency": concurrency,
+        "requests": len(results),
+        "throughput_rps": round(len(latencies) / wall, 2),
+        "error_rate": round(errors / len(results), 4) if results else 0.0,
+        "latency_ms": {
+            "p50": percentile(latencies, 50),
+            "p95": percentile(latencies, 95),
+            "p99": percentile(latencies, 99),
+            "mean": statistics.mean(latencies) if latencies else None,
+        },
+        "by_endpoint": {
+            kind: sum(1 for r in results if r[0] == kind) for kind in {r[0] for r in results}
+        },
+    }
+    level["latency_ms"] = {k: round(v, 1) if v is not None else None for k, v in level["latency_ms"].items()}
+    if sampler:
+        level["processes"] = sampler.stop()
+    return level
+
+
+def saturation_point(levels):
+    """First concurrency where throughput gains <5% over the previous level"""
+    for prev, cur in zip(levels, levels[1:]):
+        if cur["throughput_rps"] < prev["throughput_rps"] * 1.05:
+            return prev["concurrency"]
+    return None
+
+
+def server_info(base_url):
+    """The LLM and embeddings the server actually runs with, from /health"""
+    try:
+        rag = requests.get(f"{base_url}/health", timeout=5).json()["rag_system"]
+        return {"llm": rag.get("llm"), "embeddings": rag.get("embeddings")}
+    except (requests.RequestException, KeyError, ValueError):
+        return {"llm": None, "embeddings": None}
+
+
+def sweep(base_url, args, master_pid=None):
+    questions = load_questions(base_url)
+    server = server_info(base_url)
+    levels = []
+    for concurrency in args.concurrency:
+        level = run_level(base_url, args.workload, concurrency, args.duration,
+                          questions, args.upload_ratio, master_pid)
+        print_level(level)
+        levels.append(level)
+    return {"server": server, "levels": levels, "saturates_at": saturation_point(levels)}
+
+
+# -----------------------------------------------------------------------------
+# Gunicorn configuration comparison
+# -----------------------------------------------------------------------------
+
+def wait_until_ready(base_url, proc, workers):
+    """Wait until every worker has answered /health as ready (status 200)"""
+    ready_pids = set()
+    deadline = time.time() + STARTUP_TIMEOUT
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"gunicorn exited with code {proc.returncode}")
+        try:
+            # A fresh connection per poll so requests spread across workers
+            response = requests.get(f"{base_url}/health", timeout=2)
+            if response.status_code == 200:
+                ready_pids.add(response.json()["rag_system"]["worker_pid"])
+        except (requests.RequestException, KeyError, ValueError):
+            pass
+        live = set(worker_pids(proc.pid)) - {proc.pid}
+        if len(live) >= workers and live <= ready_pids:
+            return
+        time.sleep(0.2)
+    raise RuntimeError(f"only {len(ready_pids)}/{workers} gunicorn workers became ready in time")
+
+
+def isolated_workdir():
+    """Temp copy of the index and uploads so each configuration starts identical"""
+    workdir = Path(tempfile.mkdtemp(prefix="rag-loadtest-"))
+    shutil.copytree(REPO_ROOT / "store", workdir / "store")
+    shutil.copytree(REPO_ROOT / "data" / "uploads", workdir / "data" / "uploads")
+    return workdir
+
+
+def run_gunicorn_config(config, args):
+    workers, threads = (int(x) for x in config.lower().split("x"))
+    base_url = f"http://127.0.0.1:{args.port}"
+    cmd = ["gunicorn", "--bind", f"127.0.0.1:{args.port}", "--workers", str(workers),
+           "--threads", str(threads), "--timeout", "120",
+           "--pythonpath", str(REPO_ROOT), "app:app"]
+    print(f"\n▶️  gunicorn workers={workers} threads={threads}")
+    workdir = isolated_workdir()
+    proc = subprocess.Popen(cmd, cwd=workdir, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_until_ready(base_url, proc, workers)
+        result = sweep(base_url, args, master_pid=proc.pid)
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+        shutil.rmtree(workdir, ignore_errors=True)
+    return {"workers": workers, "threads": threads, **result}
+
+
+# -----------------------------------------------------------------------------
+# Reporting
+# -----------------------------------------------------------------------------
+
+def print_level(level):
+    lat = level["latency_ms"]
+    line = (f"  c={level['concurrency']:<3} {level['throughput_rps']:>7.2f} req/s  "
+            f"p50={lat['p50']}ms p95={lat['p95']}ms p99={lat['p99']}ms  "
+            f"errors={level['error_rate']:.1%}")
+    workers = [p for p in level.get("processes", []) if p["role"] == "worker"]
+    if workers:
+        line += "  workers=" + ", ".join(f"{p['cpu_percent']}%/{p['peak_rss_mb']}MB" for p in workers)
+    print(line)
+
+
+def print_summary(runs):
+    print("\n" + "=" * 60)
+    print("📊 Load Test Summary")
+    print("=" * 60)
+    for run in runs:
+        best = max(run["levels"], key=lambda lv: lv["throughput_rps"])
+        label = f"{run['workers']}x{run['threads']}" if "workers" in run else run["base_url"]
+        print(f"{label:<24} peak {best['throughput_rps']:.2f} req/s at c={best['concurrency']}, "
+              f"p95={best['latency_ms']['p95']}ms, saturates at c={run['saturates_at']}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the RAG API")
+    parser.add_argument("--base-url", default=BASE_URL, help="Running instance to test")
+    parser.add_argument("--workload", choices=["ask", "upload", "mixed"], default="ask")
+    parser.add_argument("--concurrency", default="1,2,4,8,16",
+                        type=lambda s: [int(x) for x in s.split(",")],
+                        help="Comma-separated concurrency levels to sweep")
+    parser.add_argument("--duration", type=float, default=20, help="Seconds per concurrency level")
+    parser.add_argument("--upload-ratio", type=float, default=0.05,
+                        help="Fraction of uploads in the mixed workload")
+    parser.add_argument("--pid", type=int, help="gunicorn master PID of --base-url for CPU/RSS stats")
+    parser.add_argument("--gunicorn", type=lambda s: s.split(","),
+                        help="Launch gunicorn per WORKERSxTHREADS config, e.g. 2x1,2x4,4x1")
+    parser.add_argument("--port", type=int, default=8100, help="Port for launched gunicorn instances")
+    parser.add_argument("--output", default="load_report.json", help="JSON report path")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    print("\n" + "=" * 60)
+    print(f"🔥 RAG API Load Test - workload={args.workload}, duration={args.duration}s/level")
+    print("=" * 60)
+
+    if args.gunicorn:
+        runs = [run_gunicorn_config(config, args) for config in args.gunicorn]
+    else:
+        try:
+            requests.get(f"{args.base_url}/health", timeout=2)
+        except requests.exceptions.ConnectionError:
+            print("❌ Server not running! Start with: bash deploy.sh")
+            return False
+        runs = [{"base_url": args.base_url, **sweep(args.base_url, args, master_pid=args.pid)}]
+
+    report = {
+        "workload": args.workload,
+        "duration_s": args.duration,
+        "concurrency": args.concurrency,
+        "runs": runs,
+    }
+    Path(args.output).write_text(json.dumps(report, indent=2))
+    print_summary(runs)
+    print(f"\n📝 Report written to {args.output}")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
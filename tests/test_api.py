@@ -24,6 +24,18 @@ class TestHealthEndpoints:
         assert data["status"] == "healthy"
         assert "rag_system" in data
         print("✅ Health check JSON working")
+
+    def test_health_reports_rag_system(self):
+        """Test /health reports index size, readiness and probe latency"""
+        response = requests.get(f"{BASE_URL}/health", timeout=5)
+        assert response.status_code == 200
+        rag = response.json()["rag_system"]
+        assert rag["ready"] is True
+        assert rag["index_size"] > 0
+        assert rag["embedding_model_loaded"] is True
+        assert "p95_ms" in rag["latency"]
+        assert "slo_ms" in rag["latency"]
+        print(f"✅ Health reports {rag['index_size']} indexed chunks")
     
     def test_health_ui(self):
         """Test /health-ui endpoint returns HTML"""
@@ -0,0 +1,50 @@
+"""
+Unit tests for the /health latency monitor (no running server needed)
+"""
+
+import time
+
+from src.monitor import LatencyMonitor
+
+
+class TestLatencyMonitor:
+    """SLO breach detection and recovery"""
+
+    def test_breaches_when_p95_over_slo(self):
+        monitor = LatencyMonitor(window_s=60, slo_ms=100)
+        for _ in range(3):
+            monitor.record(0.5)
+        assert monitor.breached()
+        assert monitor.summary()["p95_ms"] == 500.0
+
+    def test_needs_minimum_samples(self):
+        monitor = LatencyMonitor(window_s=60, slo_ms=100)
+        monitor.record(0.5)
+        assert not monitor.breached()
+
+    def test_slow_samples_age_out(self):
+        monitor = LatencyMonitor(window_s=0.1, slo_ms=100)
+        for _ in range(3):
+            monitor.record(0.5)
+        time.sleep(0.2)
+        assert not monitor.breached()
+        assert monitor.summary()["samples"] == 0
+
+    def test_error_clears_on_next_probe_only(self):
+        monitor = LatencyMonitor(window_s=60, slo_ms=100)
+        monitor.record_error(RuntimeError("index missing"))
+        monitor.record(0.01, probe=False)
+        assert monitor.breached()
+        monitor.record(0.01)
+        assert not monitor.breached()
+
+    def test_slow_traffic_reported_but_not_breaching(self):
+        monitor = LatencyMonitor(window_s=60, slo_ms=100)
+        for _ in range(5):
+            monitor.record(0.01)
+            monitor.record(3.0, probe=False)  # e.g. a slow LLM answer
+        assert not monitor.breached()
+        summary = monitor.summary()
+        assert summary["p95_ms"] == 10.0
+        assert summary["traffic_p95_ms"] == 3000.0
+        assert summary["traffic_samples"] == 5
@@ -0,0 +1,79 @@
+"""
+Unit tests for the re-ranking stage (no running server needed)
+"""
+
+import pytest
+from langchain_core.documents import Document
+
+from src import rerank
+
+
+class FakeCrossEncoder:
+    """Scores a pair by how often the query's last word appears in the chunk"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def predict(self, pairs, batch_size=None, show_progress_bar=False):
+        self.calls += 1
+        return [text.lower().count(query.lower().split()[-1]) for query, text in pairs]
+
+
+@pytest.fixture(autouse=True)
+def reset_state(monkeypatch):
+    monkeypatch.setattr(rerank, "_seconds_per_pair", None)
+    monkeypatch.setattr(rerank, "_score_cache", rerank.OrderedDict())
+    for name in ["RERANK_MIN_FETCH_K", "RERANK_MAX_FETCH_K", "RERANK_LATENCY_BUDGET_MS"]:
+        monkeypatch.delenv(name, raising=False)
+
+
+class TestChooseFetchK:
+    """Candidate pool sizing from the latency budget"""
+
+    def test_starts_at_minimum_without_measurement(self):
+        assert rerank.choose_fetch_k(4) == 8
+
+    def test_minimum_never_below_top_k(self):
+        assert rerank.choose_fetch_k(12) == 12
+
+    def test_budget_sets_pool_size(self, monkeypatch):
+        monkeypatch.setattr(rerank, "_seconds_per_pair", 0.01)
+        assert rerank.choose_fetch_k(4) == 15  # 150ms / 10ms per pair
+
+    def test_clamped_to_maximum(self, monkeypatch):
+        monkeypatch.setattr(rerank, "_seconds_per_pair", 0.0001)
+        assert rerank.choose_fetch_k(4) == 32
+
+    def test_clamped_to_minimum_when_slow(self, monkeypatch):
+        monkeypatch.setattr(rerank, "_seconds_per_pair", 1.0)
+        assert rerank.choose_fetch_k(4) == 8
+
+
+class TestRerank:
+    """Ordering and caching of cross-encoder scores"""
+
+    docs = [
+        Document(page_content="nothing relevant here"),
+        Document(page_content="docker docker docker"),
+        Document(page_content="docker once"),
+    ]
+
+    def test_orders_by_score_and_truncates(self):
+        ranked = rerank.rerank("what is docker", self.docs, FakeCrossEncoder(), top_k=2)
+        assert [d.page_content for d in ranked] == ["docker docker docker", "docker once"]
+
+    def test_without_reranker_keeps_faiss_order(self):
+        ranked = rerank.rerank("what is docker", self.docs, None, top_k=2)
+        assert ranked == self.docs[:2]
+
+    def test_scores_are_cached_per_pair(self):
+        encoder = FakeCrossEncoder()
+        rerank.rerank("what is docker", self.docs, encoder, top_k=2)
+        rerank.rerank("what is docker", self.docs, encoder, top_k=2)
+        assert encoder.calls == 1
+
+    def test_use_cache_false_runs_model(self):
+        encoder = FakeCrossEncoder()
+        rerank.rerank("what is docker", self.docs, encoder, top_k=2)
+        rerank.rerank("what is docker", self.docs, encoder, top_k=2, use_cache=False)
+        assert encoder.calls == 2
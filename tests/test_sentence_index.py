@@ -0,0 +1,110 @@
+"""
+Unit tests for the LOCAL extractive sentence index (no running server needed)
+"""
+
+import numpy as np
+from langchain_core.documents import Document
+
+from src.sentence_index import SentenceIndex, split_sentences
+from src.utils import chunk_key
+
+
+class FakeEmbeddings:
+    """2-d vectors: (mentions docker, mentions python)"""
+
+    def __init__(self):
+        self.embedded = []
+
+    def embed_documents(self, texts):
+        self.embedded.extend(texts)
+        return [[float("docker" in t.lower()), float("python" in t.lower())] for t in texts]
+
+
+class TestSplitSentences:
+    """Sentence boundaries, headings and list markers"""
+
+    def test_headings_are_dropped_and_separate_blocks(self):
+        text = "## Docker Basics\nDocker packages applications into containers.\n## Next"
+        assert split_sentences(text) == ["Docker packages applications into containers."]
+
+    def test_list_markers_stripped(self):
+        text = "- **Use Cases**: spam detection and pricing\n1. Second item is a list entry too"
+        assert split_sentences(text) == [
+            "**Use Cases**: spam detection and pricing",
+            "Second item is a list entry too",
+        ]
+
+    def test_short_fragments_and_multiple_sentences(self):
+        text = "Too short.\nPython is a language for data work. It has many libraries available."
+        assert split_sentences(text) == [
+            "Python is a language for data work.",
+            "It has many libraries available.",
+        ]
+
+
+class TestExtendAndCopy:
+    """Incremental indexing of chunks"""
+
+    chunk = Document(page_content="Docker runs containers on any host. Python scripts can call it.")
+
+    def test_extend_skips_already_indexed_chunks(self):
+        embeddings = FakeEmbeddings()
+        index = SentenceIndex.build([self.chunk], embeddings)
+        index.extend([self.chunk], embeddings)
+        assert len(index.sentences) == 2
+        assert len(embeddings.embedded) == 2
+        assert index.spans[chunk_key(self.chunk.page_content)] == [0, 2]
+        assert index.vectors.dtype == np.float16
+
+    def test_copy_leaves_original_unchanged(self):
+        original = SentenceIndex.build([self.chunk], FakeEmbeddings())
+        updated = original.copy()
+        updated.extend([Document(page_content="A brand new python sentence is here.")], FakeEmbeddings())
+        assert len(updated.sentences) == 3
+        assert len(original.sentences) == 2
+        assert len(original.vectors) == 2
+        assert len(original.spans) == 1
+
+    def test_save_and_load_round_trip(self, tmp_path):
+        index = SentenceIndex.build([self.chunk], FakeEmbeddings())
+        index.save(tmp_path)
+        loaded = SentenceIndex.load(tmp_path)
+        assert loaded.sentences == index.sentences
+        np.testing.assert_array_equal(loaded.vectors, index.vectors)
+        SentenceIndex.remove(tmp_path)
+        assert SentenceIndex.load(tmp_path) is None
+
+
+class TestSelect:
+    """Picking answer sentences for a query"""
+
+    def make_index(self):
+        docs = [Document(page_content="chunk one"), Document(page_content="chunk two")]
+        sentences = [
+            "Docker is a container runtime.",       # 0: best
+            "Unrelated filler sentence here.",      # 1
+            "Docker images are built in layers.",   # 2: second best
+            "Docker is a container runtime.",       # 3: duplicate from overlap
+        ]
+        vectors = np.array([[1.0], [0.0], [0.8], [1.0]], dtype=np.float16)
+        spans = {chunk_key("chunk one"): [0, 2], chunk_key("chunk two"): [2, 4]}
+        return SentenceIndex(sentences, vectors, spans), docs
+
+    def test_returns_best_sentences_in_document_order(self):
+        index, docs = self.make_index()
+        # Lower-scoring filler still comes before the sentence that follows it
+        assert index.select([1.0], docs) == [
+            "Docker is a container runtime.",
+            "Unrelated filler sentence here.",
+            "Docker images are built in layers.",
+        ]
+
+    def test_respects_max_chars(self):
+        index, docs = self.make_index()
+        picked = index.select([1.0], docs, max_chars=70)
+        assert picked == ["Docker is a container runtime.", "Docker images are built in layers."]
+        assert sum(len(s) + 1 for s in picked) <= 71
+
+    def test_unknown_chunks_give_no_sentences(self):
+        index, _ = self.make_index()
+        assert index.select([1.0], [Document(page_content="not indexed")]) == []
@@ -0,0 +1,97 @@
+"""
+Unit tests for compact vector storage and rescoring (no running server needed)
+"""
+
+import logging
+from types import SimpleNamespace
+
+import faiss
+import numpy as np
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_core.documents import Document
+
+from src import vector_store
+
+
+def make_store(vectors):
+    """Minimal FAISS-like store: flat L2 index plus a docstore of 'doc<i>'"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    index = faiss.IndexFlatL2(vectors.shape[1])
+    index.add(vectors)
+    ids = {i: f"id{i}" for i in range(len(vectors))}
+    docstore = InMemoryDocstore({f"id{i}": Document(page_content=f"doc{i}") for i in ids})
+    return SimpleNamespace(index=index, docstore=docstore, index_to_docstore_id=ids)
+
+
+class TestRescore:
+    """Exact re-ordering of first-pass candidates"""
+
+    vectors = np.array([[1, 0], [0, 1], [0.9, 0.1], [-1, 0]], dtype=np.float32)
+
+    def test_l2_ordering(self):
+        query = np.array([1, 0], dtype=np.float32)
+        ids = vector_store._rescore(query, np.array([3, 1, 2, 0]), self.vectors, faiss.METRIC_L2)
+        assert ids.tolist() == [0, 2, 1, 3]
+
+    def test_inner_product_ordering(self):
+        query = np.array([0, 1], dtype=np.float32)
+        ids = vector_store._rescore(query, np.array([0, 1, 2, 3]), self.vectors,
+                                    faiss.METRIC_INNER_PRODUCT)
+        assert ids.tolist()[0] == 1
+        assert ids.tolist()[1] == 2
+
+    def test_missing_ids_dropped(self):
+        query = np.array([1, 0], dtype=np.float32)
+        ids = vector_store._rescore(query, np.array([2, -1, 0, -1]), self.vectors, faiss.METRIC_L2)
+        assert ids.tolist() == [0, 2]
+
+
+class TestSearch:
+    """First-pass search with optional float32 rescoring"""
+
+    indexed = [[0, 0], [1, 0], [2, 0], [3, 0]]
+    # Exact vectors deliberately ranked the other way round from the index
+    exact = np.array([[3, 0], [2, 0], [1, 0], [0, 0]], dtype=np.float32)
+
+    def test_rescoring_reorders_candidates(self):
+        vs = make_store(self.indexed)
+        docs = vector_store.search(vs, [0, 0], k=2, rescore_vectors=self.exact, rescore_k=4)
+        assert [d.page_content for d in docs] == ["doc3", "doc2"]
+
+    def test_length_mismatch_skips_rescoring_with_warning(self, caplog):
+        vs = make_store(self.indexed)
+        with caplog.at_level(logging.WARNING):
+            docs = vector_store.search(vs, [0, 0], k=2, rescore_vectors=self.exact[:3], rescore_k=4)
+        assert [d.page_content for d in docs] == ["doc0", "doc1"]
+        assert "Rescoring skipped" in caplog.text
+
+
+class TestSideFile:
+    """Rescoring vectors on disk"""
+
+    def test_append_extends_current_vectors(self, tmp_path):
+        current = np.ones((3, 2), dtype=np.float32)
+        # A different (stale) file on disk must not be what gets extended
+        vector_store.save_rescore_vectors(tmp_path, np.zeros((5, 2), dtype=np.float32))
+
+        updated = vector_store.append_rescore_vectors(tmp_path, current, [[2, 2], [3, 3]])
+        on_disk = vector_store.load_rescore_vectors(tmp_path)
+        assert updated.shape == (5, 2)
+        np.testing.assert_array_equal(on_disk, updated)
+        np.testing.assert_array_equal(on_disk[3:], [[2, 2], [3, 3]])
+
+    def test_append_without_current_is_noop(self, tmp_path):
+        assert vector_store.append_rescore_vectors(tmp_path, None, [[1, 1]]) is None
+        assert vector_store.load_rescore_vectors(tmp_path) is None
+
+
+class TestRecall:
+    """Held-out recall of a compact index"""
+
+    def test_held_out_recall_in_range(self):
+        vectors = np.random.default_rng(1).normal(size=(100, 16)).astype(np.float32)
+        for storage in ("float16", "int8"):
+            first_pass, rescored = vector_store.held_out_recall(vectors, storage, faiss.METRIC_L2)
+            assert 0.0 <= first_pass <= 1.0
+            assert 0.0 <= rescored <= 1.0
+            assert rescored >= first_pass